@@ -1,14 +1,20 @@
 import os
+import shutil
 import logging
 import asyncio
 from flask import Flask, render_template, request, redirect, url_for, flash, jsonify
-from flask_wtf import FlaskForm
-from flask_wtf.file import FileField, FileAllowed, FileRequired
-from wtforms import StringField, TextAreaField, SubmitField
-from wtforms.validators import DataRequired, Email, Length
 from werkzeug.utils import secure_filename
 from werkzeug.middleware.proxy_fix import ProxyFix
 from email_service import send_document_submission_email
+from bundle_service import BUNDLE_MODE, get_submission_bundle
+from submission_schema import SUBMISSION_SCHEMA, file_size, format_file_size
+from logging_config import setup_logging, log_submission
+from tracing import setup_trace_export, traced, span, start_span, get_trace, get_trace_id
+
+# Configure logging before anything else logs
+setup_logging()
+setup_trace_export()
+
 # Temporarily disable telegram imports to fix startup issue
 try:
     from telegram_bot import initialize_bot, send_application_to_telegram
@@ -18,16 +24,13 @@ except ImportError as e:
     TELEGRAM_ENABLED = False
     def initialize_bot():
         return False
-    async def send_application_to_telegram(form_data, files):
+    async def send_application_to_telegram(form_data, files, bundle=None):
         logging.info("Telegram bot not available - skipping notification")
 import uuid
 from datetime import datetime
 import threading
 import io
 
-# Configure logging
-logging.basicConfig(level=logging.DEBUG)
-
 app = Flask(__name__)
 app.secret_key = os.environ.get("SESSION_SECRET", "dev-secret-key-change-in-production")
 app.wsgi_app = ProxyFix(app.wsgi_app, x_proto=1, x_host=1)
@@ -51,8 +54,7 @@ init_telegram_bot()
 
 # Configure upload settings
 UPLOAD_FOLDER = 'uploads'
-ALLOWED_EXTENSIONS = {'txt', 'pdf', 'png', 'jpg', 'jpeg', 'gif', 'doc', 'docx'}
-MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max file size
+MAX_CONTENT_LENGTH = SUBMISSION_SCHEMA.max_request_size
 
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 app.config['MAX_CONTENT_LENGTH'] = MAX_CONTENT_LENGTH
@@ -60,9 +62,45 @@ app.config['MAX_CONTENT_LENGTH'] = MAX_CONTENT_LENGTH
 # Ensure upload directory exists
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 
-def allowed_file(filename):
-    return '.' in filename and \
-           filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+def save_submission_files(files, submission_id):
+    """Save uploaded files to the submission folder and return the folder and paths by field"""
+    submission_folder = os.path.join(app.config['UPLOAD_FOLDER'], submission_id)
+    os.makedirs(submission_folder, exist_ok=True)
+    
+    saved_files = {}
+    for field_name, file_obj in files.items():
+        filename = secure_filename(file_obj.filename)
+        name, ext = os.path.splitext(filename)
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        final_filename = f"{field_name}_{timestamp}_{name}{ext}"
+        
+        filepath = os.path.join(submission_folder, final_filename)
+        file_obj.save(filepath)
+        file_obj.seek(0)  # Reset file pointer after saving
+        saved_files[field_name] = filepath
+    
+    return submission_folder, saved_files
+
+def build_submission_bundle(files, submission_id, upload_bytes):
+    """
+    Save the submission files and build their ZIP bundle
+
+    The submission folder is removed if either step fails, so no partial
+    files are left behind.
+
+    Returns:
+        tuple: (submission_folder, bundle)
+    """
+    submission_folder = os.path.join(app.config['UPLOAD_FOLDER'], submission_id)
+    try:
+        with span('bundle', bytes=upload_bytes) as bundle_span:
+            submission_folder, saved_files = save_submission_files(files, submission_id)
+            bundle = get_submission_bundle(submission_folder, saved_files)
+            bundle_span.set_attribute('bundle_bytes', os.path.getsize(bundle['path']))
+    except Exception:
+        shutil.rmtree(submission_folder, ignore_errors=True)
+        raise
+    return submission_folder, bundle
 
 # Brokerage companies data
 BROKERAGE_COMPANIES = [
@@ -76,130 +114,89 @@ BROKERAGE_COMPANIES = [
     {"name": "Partner Company 8", "logo": "static/images/logo8.webp"}
 ]
 
-class DocumentUploadForm(FlaskForm):
-    # Driver Information
-    full_name = StringField('Полное имя', validators=[DataRequired(), Length(min=2, max=100)])
-    phone = StringField('Телефон', validators=[DataRequired(), Length(min=10, max=20)])
-    email = StringField('Email', validators=[DataRequired(), Email()])
-    
-    # Required Documents
-    drivers_license = FileField('Водительское удостоверение CDL', 
-                               validators=[FileRequired(), FileAllowed(ALLOWED_EXTENSIONS)])
-    medical_certificate = FileField('Медицинская справка DOT', 
-                                   validators=[FileRequired(), FileAllowed(ALLOWED_EXTENSIONS)])
-    social_security = FileField('Карточка социального страхования', 
-                               validators=[FileRequired(), FileAllowed(ALLOWED_EXTENSIONS)])
-    vehicle_registration = FileField('Регистрация транспортного средства', 
-                                    validators=[FileRequired(), FileAllowed(ALLOWED_EXTENSIONS)])
-    insurance_certificate = FileField('Страховой сертификат', 
-                                     validators=[FileRequired(), FileAllowed(ALLOWED_EXTENSIONS)])
-    ifta_permit = FileField('Разрешение IFTA (если применимо)', 
-                           validators=[FileAllowed(ALLOWED_EXTENSIONS)])
-    mc_authority = FileField('MC Authority (если есть)', 
-                            validators=[FileAllowed(ALLOWED_EXTENSIONS)])
-    
-    submit = SubmitField('Отправить документы')
-
 @app.route('/')
 def index():
-    return render_template('index.html', companies=BROKERAGE_COMPANIES)
+    return render_template('index.html', companies=BROKERAGE_COMPANIES,
+                           submission_schema=SUBMISSION_SCHEMA.json)
 
 @app.route('/success.html')
 def success():
     return render_template('success.html')
 
 @app.route('/upload', methods=['POST'])
+@traced('POST /upload')
 def upload_documents():
     if request.method == 'POST':
         try:
-            # Get form data
-            form_data = {
-                'full_name': request.form.get('full_name', ''),
-                'phone': request.form.get('phone', ''),
-                'email': request.form.get('email', '')
-            }
+            validation_span = start_span('validation')
             
-            # Validate required fields
-            if not all([form_data['full_name'], form_data['phone'], form_data['email']]):
-                flash('All personal information fields are required', 'error')
+            # Validate form data and uploaded files against the submission schema
+            form_data, files, error = SUBMISSION_SCHEMA.validate(request.form, request.files)
+            if error:
+                flash(error, 'error')
                 return redirect(url_for('index'))
             
-            # Get uploaded files
-            files = {}
-            file_fields = ['drivers_license', 'medical_certificate', 'w9_form',
-                          'vehicle_registration', 'insurance_certificate', 'mc_authority']
-            
-            for field_name in file_fields:
-                if field_name in request.files:
-                    file_obj = request.files[field_name]
-                    if file_obj and file_obj.filename:
-                        if allowed_file(file_obj.filename):
-                            files[field_name] = file_obj
-                        else:
-                            flash(f'Invalid file type for {field_name}', 'error')
-                            return redirect(url_for('index'))
-            
-            # Check if required documents are present
-            required_docs = ['drivers_license', 'medical_certificate', 'w9_form',
-                           'vehicle_registration', 'insurance_certificate']
-            missing_docs = [doc for doc in required_docs if doc not in files]
+            submission_id = str(uuid.uuid4())
+            upload_bytes = sum(file_size(file_obj) for file_obj in files.values())
+            validation_span.set_attribute('documents', len(files))
+            validation_span.set_attribute('bytes', upload_bytes)
+            validation_span.end()
+            get_trace().root.set_attribute('submission_id', submission_id)
             
-            if missing_docs:
-                flash(f'Missing required documents: {", ".join(missing_docs)}', 'error')
-                return redirect(url_for('index'))
+            # In bundle mode the files are saved first and zipped from disk
+            bundle = None
+            if BUNDLE_MODE:
+                submission_folder, bundle = build_submission_bundle(files, submission_id, upload_bytes)
             
             # Send email with documents
-            email_success = send_document_submission_email(form_data, files)
+            with span('email'):
+                email_success = send_document_submission_email(form_data, files, bundle=bundle)
             
             # Send to Telegram bot
             telegram_success = False
             if telegram_bot_initialized:
-                try:
-                    # Create copies of files for Telegram (since we need to reset file pointers)
-                    telegram_files = {}
-                    for field_name, file_obj in files.items():
-                        file_obj.seek(0)
-                        file_content = file_obj.read()
-                        telegram_files[field_name] = io.BytesIO(file_content)
-                        telegram_files[field_name].name = file_obj.filename
-                        file_obj.seek(0)  # Reset original file pointer
+                with span('telegram'):
+                    try:
+                        # Create copies of files for Telegram (since we need to reset file pointers)
+                        telegram_files = {}
+                        if not bundle:
+                            for field_name, file_obj in files.items():
+                                file_obj.seek(0)
+                                file_content = file_obj.read()
+                                telegram_files[field_name] = io.BytesIO(file_content)
+                                telegram_files[field_name].name = file_obj.filename
+                                file_obj.seek(0)  # Reset original file pointer
                     
-                    # Send to Telegram asynchronously
-                    loop = asyncio.new_event_loop()
-                    asyncio.set_event_loop(loop)
-                    telegram_success = loop.run_until_complete(
-                        send_application_to_telegram(form_data, telegram_files)
-                    )
-                    loop.close()
+                        # Send to Telegram asynchronously
+                        loop = asyncio.new_event_loop()
+                        asyncio.set_event_loop(loop)
+                        telegram_success = loop.run_until_complete(
+                            send_application_to_telegram(form_data, telegram_files, bundle=bundle)
+                        )
+                        loop.close()
                     
-                    if telegram_success:
-                        logging.info("Application sent to Telegram successfully")
-                    else:
-                        logging.error("Failed to send application to Telegram")
+                        if telegram_success:
+                            logging.info("Application sent to Telegram successfully")
+                        else:
+                            logging.error("Failed to send application to Telegram")
                         
-                except Exception as e:
-                    logging.error(f"Error sending to Telegram: {e}")
+                    except Exception as e:
+                        logging.error(f"Error sending to Telegram: {e}")
             
-            if email_success or telegram_success:
-                # Create unique folder for backup storage
-                submission_id = str(uuid.uuid4())
-                submission_folder = os.path.join(app.config['UPLOAD_FOLDER'], submission_id)
-                os.makedirs(submission_folder, exist_ok=True)
-                
+            success = email_success or telegram_success
+            if success and not bundle:
                 # Save files locally as backup
-                for field_name, file_obj in files.items():
-                    filename = secure_filename(file_obj.filename)
-                    name, ext = os.path.splitext(filename)
-                    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                    final_filename = f"{field_name}_{timestamp}_{name}{ext}"
-                    
-                    filepath = os.path.join(submission_folder, final_filename)
-                    file_obj.save(filepath)
-                    file_obj.seek(0)  # Reset file pointer after saving
-                
-                app.logger.info(f"Document submission from {form_data['full_name']}, Email: {form_data['email']}")
-                app.logger.info(f"Submission ID: {submission_id}")
-                
+                with span('storage', bytes=upload_bytes):
+                    save_submission_files(files, submission_id)
+            elif bundle and not success:
+                # Bundle mode saved the files up front; drop them like a failed normal submission
+                shutil.rmtree(submission_folder, ignore_errors=True)
+            
+            log_submission(submission_id, form_data, files.keys(), get_trace().stage_timings(),
+                           {'telegram': telegram_success, 'email': email_success},
+                           endpoint='/upload', success=success, trace_id=get_trace_id())
+            
+            if success:
                 flash('Documents submitted successfully!', 'success')
                 return redirect('/success.html')
             else:
@@ -215,101 +212,97 @@ def upload_documents():
     return redirect(url_for('index'))
 
 @app.route('/api/submit', methods=['POST'])
+@traced('POST /api/submit')
 def api_submit():
     """API endpoint for form submission from static HTML"""
     try:
-        # Get form data
-        form_data = {
-            'full_name': request.form.get('full_name', '').strip(),
-            'phone': request.form.get('phone', '').strip(),
-            'email': request.form.get('email', '').strip(),
-            'experience': request.form.get('experience', '').strip(),
-            'comments': request.form.get('comments', '').strip()
-        }
+        validation_span = start_span('validation')
         
-        # Validate required fields
-        if not all([form_data['full_name'], form_data['phone'], form_data['email']]):
-            return jsonify({'success': False, 'error': 'All personal information fields are required'}), 400
+        # Validate form data and uploaded files against the submission schema
+        form_data, files, error = SUBMISSION_SCHEMA.validate(request.form, request.files)
+        if error:
+            return jsonify({'success': False, 'error': error, 'trace_id': get_trace_id()}), 400
         
-        # Get uploaded files
-        files = {}
-        file_fields = ['drivers_license', 'medical_certificate', 'w9_form',
-                      'vehicle_registration', 'insurance_certificate', 'mc_authority']
+        submission_id = str(uuid.uuid4())
+        upload_bytes = sum(file_size(file_obj) for file_obj in files.values())
+        validation_span.set_attribute('documents', len(files))
+        validation_span.set_attribute('bytes', upload_bytes)
+        validation_span.end()
+        get_trace().root.set_attribute('submission_id', submission_id)
         
-        for field_name in file_fields:
-            if field_name in request.files:
-                file_obj = request.files[field_name]
-                if file_obj and file_obj.filename:
-                    if allowed_file(file_obj.filename):
-                        files[field_name] = file_obj
-                    else:
-                        return jsonify({'success': False, 'error': f'Invalid file type for {field_name}'}), 400
-        
-        # Check if required documents are present
-        required_docs = ['drivers_license', 'medical_certificate', 'w9_form',
-                       'vehicle_registration', 'insurance_certificate']
-        missing_docs = [doc for doc in required_docs if doc not in files]
-        
-        if missing_docs:
-            return jsonify({'success': False, 'error': f'Missing required documents: {", ".join(missing_docs)}'}), 400
+        # In bundle mode the files are saved first and zipped from disk
+        bundle = None
+        if BUNDLE_MODE:
+            submission_folder, bundle = build_submission_bundle(files, submission_id, upload_bytes)
         
         # Send to Telegram bot
         telegram_success = False
         if telegram_bot_initialized:
-            try:
-                # Create copies of files for Telegram
-                telegram_files = {}
-                for field_name, file_obj in files.items():
-                    file_obj.seek(0)
-                    file_content = file_obj.read()
-                    telegram_files[field_name] = io.BytesIO(file_content)
-                    telegram_files[field_name].name = file_obj.filename
-                    file_obj.seek(0)
+            with span('telegram'):
+                try:
+                    # Create copies of files for Telegram
+                    telegram_files = {}
+                    if not bundle:
+                        for field_name, file_obj in files.items():
+                            file_obj.seek(0)
+                            file_content = file_obj.read()
+                            telegram_files[field_name] = io.BytesIO(file_content)
+                            telegram_files[field_name].name = file_obj.filename
+                            file_obj.seek(0)
                 
-                # Send to Telegram asynchronously
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-                telegram_success = loop.run_until_complete(
-                    send_application_to_telegram(form_data, telegram_files)
-                )
-                loop.close()
+                    # Send to Telegram asynchronously
+                    loop = asyncio.new_event_loop()
+                    asyncio.set_event_loop(loop)
+                    telegram_success = loop.run_until_complete(
+                        send_application_to_telegram(form_data, telegram_files, bundle=bundle)
+                    )
+                    loop.close()
                 
-                if telegram_success:
-                    logging.info("Application sent to Telegram successfully")
+                    if telegram_success:
+                        logging.info("Application sent to Telegram successfully")
                 
-            except Exception as e:
-                logging.error(f"Error sending to Telegram: {e}")
+                except Exception as e:
+                    logging.error(f"Error sending to Telegram: {e}")
         
         # Also try sending email as backup
-        email_success = send_document_submission_email(form_data, files)
+        with span('email'):
+            email_success = send_document_submission_email(form_data, files, bundle=bundle)
         
-        if telegram_success or email_success:
+        success = telegram_success or email_success
+        if success and not bundle:
             # Save files locally as backup
-            submission_id = str(uuid.uuid4())
-            submission_folder = os.path.join(app.config['UPLOAD_FOLDER'], submission_id)
-            os.makedirs(submission_folder, exist_ok=True)
-            
-            for field_name, file_obj in files.items():
-                filename = secure_filename(file_obj.filename)
-                name, ext = os.path.splitext(filename)
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                final_filename = f"{field_name}_{timestamp}_{name}{ext}"
-                
-                filepath = os.path.join(submission_folder, final_filename)
-                file_obj.save(filepath)
-            
+            with span('storage', bytes=upload_bytes):
+                save_submission_files(files, submission_id)
+        elif bundle and not success:
+            # Bundle mode saved the files up front; drop them like a failed normal submission
+            shutil.rmtree(submission_folder, ignore_errors=True)
+        
+        log_submission(submission_id, form_data, files.keys(), get_trace().stage_timings(),
+                       {'telegram': telegram_success, 'email': email_success},
+                       endpoint='/api/submit', success=success, trace_id=get_trace_id())
+        
+        if success:
             return jsonify({
                 'success': True, 
                 'message': 'Documents submitted successfully!',
                 'telegram_sent': telegram_success,
-                'email_sent': email_success
+                'email_sent': email_success,
+                'trace_id': get_trace_id()
             })
         else:
-            return jsonify({'success': False, 'error': 'Failed to send documents. Please try again.'}), 500
+            return jsonify({'success': False, 'error': 'Failed to send documents. Please try again.', 'trace_id': get_trace_id()}), 500
             
     except Exception as e:
         logging.error(f"Error in API submit: {e}")
-        return jsonify({'success': False, 'error': 'An error occurred while processing your submission.'}), 500
+        return jsonify({'success': False, 'error': 'An error occurred while processing your submission.', 'trace_id': get_trace_id()}), 500
+
+@app.route('/api/schema')
+def submission_schema():
+    """Submission schema used by the browser to validate before uploading"""
+    response = app.response_class(SUBMISSION_SCHEMA.json, mimetype='application/json')
+    response.cache_control.public = True
+    response.cache_control.max_age = 3600
+    return response
 
 @app.route('/telegram/status')
 def telegram_status():
@@ -321,7 +314,7 @@ def telegram_status():
 
 @app.errorhandler(413)
 def too_large(e):
-    flash('Файл слишком большой. Максимальный размер файла: 16MB', 'error')
+    flash(f'Файлы слишком большие. Максимальный общий размер: {format_file_size(SUBMISSION_SCHEMA.max_request_size)}', 'error')
     return redirect(url_for('upload_documents'))
 
 if __name__ == '__main__':
@@ -0,0 +1,78 @@
+import os
+import logging
+import zipfile
+
+logger = logging.getLogger(__name__)
+
+# Pack each submission's documents into a single ZIP for delivery
+BUNDLE_MODE = os.environ.get('DELIVERY_BUNDLE_MODE', '').lower() in ('1', 'true', 'yes')
+BUNDLE_FILENAME = 'documents.zip'
+
+# Formats that are already compressed gain nothing from deflate
+STORED_EXTENSIONS = {'pdf', 'png', 'jpg', 'jpeg', 'gif', 'docx'}
+
+def build_manifest(saved_files):
+    """
+    Build the manifest of a bundle from the saved submission files
+
+    Args:
+        saved_files: Dictionary mapping field names to file paths on disk
+
+    Returns:
+        list: One dict per document with field, filename and size keys
+    """
+    manifest = []
+    for field_name, filepath in saved_files.items():
+        manifest.append({
+            'field': field_name,
+            'filename': os.path.basename(filepath),
+            'size': os.path.getsize(filepath)
+        })
+    return manifest
+
+def get_submission_bundle(submission_folder, saved_files):
+    """
+    Return the ZIP bundle for a submission, building it on first use
+
+    The archive is written by streaming each file from disk and is kept
+    in the submission folder, so later calls reuse it.
+
+    Args:
+        submission_folder: Folder the submission files were saved to
+        saved_files: Dictionary mapping field names to file paths on disk
+
+    Returns:
+        dict: Bundle with path, filename and manifest keys
+    """
+    bundle_path = os.path.join(submission_folder, BUNDLE_FILENAME)
+
+    if not os.path.exists(bundle_path):
+        tmp_path = bundle_path + '.tmp'
+        try:
+            with zipfile.ZipFile(tmp_path, 'w') as archive:
+                for filepath in saved_files.values():
+                    ext = filepath.rsplit('.', 1)[-1].lower()
+                    compression = zipfile.ZIP_STORED if ext in STORED_EXTENSIONS else zipfile.ZIP_DEFLATED
+                    archive.write(filepath, arcname=os.path.basename(filepath), compress_type=compression)
+        except Exception:
+            # Never leave a partial archive behind
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        os.replace(tmp_path, bundle_path)
+        logger.info(f"Built document bundle {bundle_path}")
+
+    return {
+        'path': bundle_path,
+        'filename': BUNDLE_FILENAME,
+        'manifest': build_manifest(saved_files)
+    }
+
+def format_manifest(manifest, document_names):
+    """Format bundle manifest entries as text lines using the given display names"""
+    lines = []
+    for entry in manifest:
+        display_name = document_names.get(entry['field'], entry['field'])
+        size_kb = entry['size'] / 1024
+        lines.append(f"{display_name}: {entry['filename']} ({size_kb:.1f} KB)")
+    return lines
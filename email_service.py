@@ -1,33 +1,62 @@
 import os
 import sys
-from sendgrid import SendGridAPIClient
-from sendgrid.helpers.mail import Mail, Email, To, Content, Attachment
-import base64
+import logging
 from werkzeug.datastructures import FileStorage
+from bundle_service import format_manifest
+from submission_schema import SUBMISSION_SCHEMA
+from email_transport import get_email_transport
+from tracing import span
 
-def send_document_submission_email(form_data, files):
+logger = logging.getLogger(__name__)
+
+def send_document_submission_email(form_data, files, bundle=None):
     """
-    Send document submission email via SendGrid
+    Send document submission email via the configured transport
     
     Args:
         form_data: Dictionary containing form data
         files: Dictionary of uploaded files
+        bundle: Optional ZIP bundle sent as a single attachment instead of the files
     
     Returns:
         bool: True if email sent successfully, False otherwise
     """
     
-    sendgrid_key = os.environ.get('SENDGRID_API_KEY')
-    if not sendgrid_key:
-        print("SENDGRID_API_KEY not found in environment variables")
+    transport = get_email_transport()
+    if not transport:
         return False
     
-    sg = SendGridAPIClient(sendgrid_key)
+    message = build_submission_email(form_data, files, bundle)
+    
+    with span('email.send', transport=transport.name, attachments=len(message['attachments'])) as send_span:
+        try:
+            bytes_sent = transport.send(message)
+            if send_span:
+                send_span.set_attribute('bytes', bytes_sent)
+            return True
+            
+        except Exception as e:
+            logger.error(f"Email transport error ({transport.name}): {e}")
+            if send_span:
+                send_span.set_error(e)
+            return False
+
+def build_submission_email(form_data, files, bundle=None):
+    """
+    Build the document submission email independently of the transport
+    
+    Args:
+        form_data: Dictionary containing form data
+        files: Dictionary of uploaded files
+        bundle: Optional ZIP bundle attached instead of the files
+    
+    Returns:
+        dict: Message with subject, sender, recipient, html and attachments,
+        each attachment read from its path on disk or its file object
+    """
     
     # Email content
     subject = "New Trucking Document Submission"
-    from_email = Email("noreply@trucking-docs.com", "Trucking Document System")
-    to_email = To(form_data.get('_replyto', 'admin@example.com'))
     
     # Create HTML content
     html_content = f"""
@@ -62,20 +91,16 @@ def send_document_submission_email(form_data, files):
     """
     
     # Add document list
-    document_names = {
-        'drivers_license': 'CDL Driver License',
-        'medical_certificate': 'DOT Medical Certificate', 
-        'social_security': 'Social Security Card',
-        'vehicle_registration': 'Vehicle Registration',
-        'insurance_certificate': 'Insurance Certificate',
-        'ifta_permit': 'IFTA Permit',
-        'mc_authority': 'MC Authority'
-    }
+    document_names = SUBMISSION_SCHEMA.document_labels['en']
     
-    for field_name, display_name in document_names.items():
-        file_obj = files.get(field_name)
-        if file_obj and file_obj.filename:
-            html_content += f'<li style="padding: 5px 0; border-bottom: 1px solid #ddd;"><strong>✓ {display_name}:</strong> {file_obj.filename}</li>'
+    if bundle:
+        for line in format_manifest(bundle['manifest'], document_names):
+            html_content += f'<li style="padding: 5px 0; border-bottom: 1px solid #ddd;">✓ {line}</li>'
+    else:
+        for field_name, display_name in document_names.items():
+            file_obj = files.get(field_name)
+            if file_obj and file_obj.filename:
+                html_content += f'<li style="padding: 5px 0; border-bottom: 1px solid #ddd;"><strong>✓ {display_name}:</strong> {file_obj.filename}</li>'
     
     html_content += """
                 </ul>
@@ -95,42 +120,29 @@ def send_document_submission_email(form_data, files):
     </html>
     """
     
-    # Create message
-    message = Mail(
-        from_email=from_email,
-        to_emails=to_email,
-        subject=subject,
-        html_content=html_content
-    )
-    
-    # Add file attachments
-    for field_name, file_obj in files.items():
-        if file_obj and file_obj.filename and hasattr(file_obj, 'read'):
-            try:
-                # Read file content
-                file_content = file_obj.read()
-                file_obj.seek(0)  # Reset file pointer
-                
-                # Encode file content
-                encoded_content = base64.b64encode(file_content).decode()
-                
-                # Create attachment
-                attachment = Attachment(
-                    file_content=encoded_content,
-                    file_name=file_obj.filename,
-                    file_type=file_obj.content_type or 'application/octet-stream',
-                    disposition='attachment'
-                )
-                message.add_attachment(attachment)
-                
-            except Exception as e:
-                print(f"Error attaching file {file_obj.filename}: {e}")
+    # Attach the bundle as a single ZIP when provided
+    if bundle:
+        attachments = [{
+            'filename': bundle['filename'],
+            'content_type': 'application/zip',
+            'path': bundle['path']
+        }]
+    else:
+        attachments = [
+            {
+                'filename': file_obj.filename,
+                'content_type': file_obj.content_type or 'application/octet-stream',
+                'file': file_obj
+            }
+            for file_obj in files.values()
+            if file_obj and file_obj.filename and hasattr(file_obj, 'read')
+        ]
     
-    try:
-        response = sg.send(message)
-        print(f"Email sent successfully. Status code: {response.status_code}")
-        return True
-        
-    except Exception as e:
-        print(f"SendGrid error: {e}")
-        return False
\ No newline at end of file
+    return {
+        'subject': subject,
+        'from_email': 'noreply@trucking-docs.com',
+        'from_name': 'Trucking Document System',
+        'to_email': form_data.get('_replyto', 'admin@example.com'),
+        'html': html_content,
+        'attachments': attachments
+    }
@@ -0,0 +1,375 @@
+import os
+import re
+import ssl
+import queue
+import base64
+import smtplib
+import logging
+from uuid import uuid4
+from email.header import Header
+from email.utils import formataddr, formatdate, make_msgid, encode_rfc2231
+
+logger = logging.getLogger(__name__)
+
+# Try to import SendGrid with fallback, so the SMTP backend works without it
+SENDGRID_AVAILABLE = False
+try:
+    from sendgrid import SendGridAPIClient
+    from sendgrid.helpers.mail import Mail, Email, To, Attachment
+    SENDGRID_AVAILABLE = True
+except ImportError as e:
+    logger.warning(f"SendGrid modules not available: {e}")
+
+# Which backend delivers submission emails: 'sendgrid' or 'smtp'
+EMAIL_TRANSPORT = os.environ.get('EMAIL_TRANSPORT', 'sendgrid').lower()
+
+# 57 input bytes encode to exactly one 76 character base64 line
+BASE64_LINE_BYTES = 57
+READ_CHUNK_BYTES = BASE64_LINE_BYTES * 1024
+SEND_BUFFER_BYTES = 64 * 1024
+
+CONTENT_TYPE_RE = re.compile(r'^[A-Za-z0-9!#$&^_.+-]+/[A-Za-z0-9!#$&^_.+-]+$')
+
+# Global transport instance
+email_transport = None
+
+def get_email_transport():
+    """Return the configured email transport, creating it on first use"""
+    global email_transport
+    if email_transport:
+        return email_transport
+
+    try:
+        if EMAIL_TRANSPORT == 'smtp':
+            email_transport = SMTPTransport.from_environ()
+        elif EMAIL_TRANSPORT == 'sendgrid':
+            email_transport = SendGridTransport.from_environ()
+        else:
+            logger.error(f"Unknown EMAIL_TRANSPORT: {EMAIL_TRANSPORT}")
+    except ValueError as e:
+        logger.warning(f"Email transport not configured: {e}")
+
+    return email_transport
+
+def check_attachments(message):
+    """Raise ValueError if any attachment cannot be read, before anything is sent"""
+    for attachment in message['attachments']:
+        if attachment.get('path'):
+            if not os.path.isfile(attachment['path']) or not os.access(attachment['path'], os.R_OK):
+                raise ValueError(f"Attachment not readable: {attachment['path']}")
+        elif not hasattr(attachment.get('file'), 'read') or not hasattr(attachment['file'], 'seek'):
+            raise ValueError(f"Attachment has no readable file: {attachment['filename']}")
+
+def read_attachment(attachment):
+    """Yield the content of an attachment in chunks, from its path or file object"""
+    if attachment.get('path'):
+        with open(attachment['path'], 'rb') as source:
+            while True:
+                chunk = source.read(READ_CHUNK_BYTES)
+                if not chunk:
+                    break
+                yield chunk
+    else:
+        source = attachment['file']
+        source.seek(0)
+        while True:
+            chunk = source.read(READ_CHUNK_BYTES)
+            if not chunk:
+                break
+            yield chunk
+        source.seek(0)  # Reset file pointer
+
+def iter_base64_lines(chunks):
+    """Base64 encode a stream of byte chunks into CRLF terminated 76 character lines"""
+    pending = b''
+    for chunk in chunks:
+        pending += chunk
+        usable = len(pending) - len(pending) % BASE64_LINE_BYTES
+        for start in range(0, usable, BASE64_LINE_BYTES):
+            yield base64.b64encode(pending[start:start + BASE64_LINE_BYTES]) + b'\r\n'
+        pending = pending[usable:]
+    if pending:
+        yield base64.b64encode(pending) + b'\r\n'
+
+def encode_header_value(value):
+    """Return a header value, RFC 2047 encoded when not ASCII"""
+    return value if value.isascii() else Header(value, 'utf-8').encode()
+
+def format_content_type(content_type):
+    """Return the content type if it is a plain ASCII type/subtype, else a generic one"""
+    if content_type and CONTENT_TYPE_RE.match(content_type):
+        return content_type
+    return 'application/octet-stream'
+
+def format_filename_params(filename):
+    """Return the filename MIME parameter, RFC 2231 encoded when not ASCII"""
+    if filename.isascii():
+        escaped = filename.replace('\\', '\\\\').replace('"', '\\"')
+        return f'filename="{escaped}"'
+    return f"filename*={encode_rfc2231(filename, 'utf-8')}"
+
+def iter_mime_message(message):
+    """
+    Yield a multipart MIME message line by line
+
+    Attachments are read from disk and encoded as they are yielded, so
+    the full message is never held in memory.
+
+    Args:
+        message: Dictionary built by email_service.build_submission_email
+
+    Returns:
+        generator: CRLF terminated byte lines of the message
+    """
+    boundary = f"=_{uuid4().hex}"
+    headers = [
+        f"From: {formataddr((message['from_name'], message['from_email']))}",
+        f"To: {encode_header_value(message['to_email'])}",
+        f"Subject: {encode_header_value(message['subject'])}",
+        f"Date: {formatdate(localtime=True)}",
+        f"Message-ID: {make_msgid(domain=message['from_email'].split('@')[-1])}",
+        "MIME-Version: 1.0",
+        f'Content-Type: multipart/mixed; boundary="{boundary}"',
+        "",
+        f"--{boundary}",
+        'Content-Type: text/html; charset="utf-8"',
+        "Content-Transfer-Encoding: base64",
+        "",
+    ]
+    for header in headers:
+        yield header.encode('ascii') + b'\r\n'
+    yield from iter_base64_lines([message['html'].encode('utf-8')])
+
+    for attachment in message['attachments']:
+        part_headers = [
+            f"--{boundary}",
+            f"Content-Type: {format_content_type(attachment['content_type'])}",
+            f"Content-Disposition: attachment; {format_filename_params(attachment['filename'])}",
+            "Content-Transfer-Encoding: base64",
+            "",
+        ]
+        for header in part_headers:
+            yield header.encode('ascii') + b'\r\n'
+        yield from iter_base64_lines(read_attachment(attachment))
+
+    yield f"--{boundary}--\r\n".encode('ascii')
+
+class SendGridTransport:
+    """Deliver emails through the SendGrid HTTP API"""
+
+    name = 'sendgrid'
+
+    def __init__(self, api_key):
+        if not SENDGRID_AVAILABLE:
+            raise ValueError("sendgrid package is not installed")
+        self.client = SendGridAPIClient(api_key)
+
+    @classmethod
+    def from_environ(cls):
+        api_key = os.environ.get('SENDGRID_API_KEY')
+        if not api_key:
+            raise ValueError("SENDGRID_API_KEY not found in environment variables")
+        return cls(api_key)
+
+    def send(self, message):
+        """Send the message and return the number of attachment bytes uploaded"""
+        mail = Mail(
+            from_email=Email(message['from_email'], message['from_name']),
+            to_emails=To(message['to_email']),
+            subject=message['subject'],
+            html_content=message['html']
+        )
+
+        attachment_bytes = 0
+        for attachment in message['attachments']:
+            try:
+                # SendGrid needs each attachment as one base64 string
+                encoded_content = base64.b64encode(b''.join(read_attachment(attachment))).decode()
+                attachment_bytes += len(encoded_content)
+                mail.add_attachment(Attachment(
+                    file_content=encoded_content,
+                    file_name=attachment['filename'],
+                    file_type=attachment['content_type'],
+                    disposition='attachment'
+                ))
+            except Exception as e:
+                logger.error(f"Error attaching file {attachment['filename']}: {e}")
+
+        response = self.client.send(mail)
+        logger.info(f"Email sent successfully. Status code: {response.status_code}")
+        return attachment_bytes
+
+class SMTPTransport:
+    """
+    Deliver emails over SMTP, reusing a pool of authenticated connections
+
+    The envelope is pipelined when the server advertises PIPELINING and
+    the message body is streamed from disk straight into the DATA command.
+    """
+
+    name = 'smtp'
+
+    def __init__(self, host, port=587, username=None, password=None, use_tls=True,
+                 pool_size=2, timeout=30, envelope_from=None):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.timeout = timeout
+        self.envelope_from = envelope_from
+        self.pool = queue.LifoQueue(maxsize=pool_size)
+
+    @classmethod
+    def from_environ(cls):
+        host = os.environ.get('SMTP_HOST')
+        if not host:
+            raise ValueError("SMTP_HOST not found in environment variables")
+        return cls(
+            host,
+            port=int(os.environ.get('SMTP_PORT', 587)),
+            username=os.environ.get('SMTP_USERNAME'),
+            password=os.environ.get('SMTP_PASSWORD'),
+            use_tls=os.environ.get('SMTP_USE_TLS', 'true').lower() in ('1', 'true', 'yes'),
+            pool_size=int(os.environ.get('SMTP_POOL_SIZE', 2)),
+            timeout=int(os.environ.get('SMTP_TIMEOUT', 30)),
+            envelope_from=os.environ.get('SMTP_FROM')
+        )
+
+    def connect(self):
+        """Open a new connection, upgraded to TLS and logged in as configured"""
+        conn = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        conn.ehlo()
+        if self.use_tls:
+            conn.starttls(context=ssl.create_default_context())
+            conn.ehlo()
+        if self.username:
+            conn.login(self.username, self.password or '')
+        logger.info(f"Opened SMTP connection to {self.host}:{self.port}")
+        return conn
+
+    def acquire(self):
+        try:
+            return self.pool.get_nowait()
+        except queue.Empty:
+            return self.connect()
+
+    def release(self, conn):
+        try:
+            self.pool.put_nowait(conn)
+        except queue.Full:
+            self.discard(conn)
+
+    def discard(self, conn):
+        try:
+            conn.quit()
+        except Exception:
+            conn.close()
+
+    def close(self):
+        """Close all pooled connections"""
+        while True:
+            try:
+                self.discard(self.pool.get_nowait())
+            except queue.Empty:
+                break
+
+    def send_envelope(self, conn, sender, recipients):
+        """Send MAIL FROM and RCPT TO, in one round trip when the server supports pipelining"""
+        mail_options = ''
+        conn.command_encoding = 'ascii'
+        if not all(address.isascii() for address in [sender] + recipients):
+            if not conn.has_extn('smtputf8'):
+                raise smtplib.SMTPNotSupportedError("Non-ASCII address and server does not support SMTPUTF8")
+            mail_options = ' SMTPUTF8'
+            conn.command_encoding = 'utf-8'
+
+        commands = [f"MAIL FROM:<{sender}>{mail_options}"] + [f"RCPT TO:<{rcpt}>" for rcpt in recipients]
+
+        if conn.has_extn('pipelining'):
+            conn.send(''.join(command + '\r\n' for command in commands))
+            replies = [conn.getreply() for _ in commands]
+        else:
+            replies = []
+            for command in commands:
+                conn.putcmd(command)
+                replies.append(conn.getreply())
+
+        code, response = replies[0]
+        if code != 250:
+            raise smtplib.SMTPSenderRefused(code, response, sender)
+        refused = {
+            rcpt: reply for rcpt, reply in zip(recipients, replies[1:])
+            if reply[0] not in (250, 251)
+        }
+        if len(refused) == len(recipients):
+            raise smtplib.SMTPRecipientsRefused(refused)
+
+    def start_data(self, conn):
+        """Send DATA and wait for the server to accept message content"""
+        conn.putcmd('data')
+        code, response = conn.getreply()
+        if code != 354:
+            raise smtplib.SMTPDataError(code, response)
+
+    def stream_data(self, conn, lines):
+        """Stream message lines after DATA with dot stuffing and return the bytes sent"""
+        sent = 0
+        buffer = bytearray()
+        for line in lines:
+            if line.startswith(b'.'):
+                buffer += b'.'
+            buffer += line
+            if len(buffer) >= SEND_BUFFER_BYTES:
+                conn.send(bytes(buffer))
+                sent += len(buffer)
+                buffer.clear()
+        buffer += b'.\r\n'
+        conn.send(bytes(buffer))
+        sent += len(buffer)
+
+        code, response = conn.getreply()
+        if code != 250:
+            raise smtplib.SMTPDataError(code, response)
+        return sent
+
+    def send(self, message):
+        """Send the message and return the number of bytes streamed to the server"""
+        sender = self.envelope_from or message['from_email']
+        recipients = [message['to_email']]
+
+        # Fail before DATA rather than in the middle of the message content
+        check_attachments(message)
+
+        # A pooled connection may have been dropped by the server; retry once on a fresh one
+        for attempt in range(2):
+            conn = self.acquire() if attempt == 0 else self.connect()
+            data_started = False
+            try:
+                self.send_envelope(conn, sender, recipients)
+                self.start_data(conn)
+                data_started = True
+                sent = self.stream_data(conn, iter_mime_message(message))
+            except (smtplib.SMTPServerDisconnected, ConnectionError) as e:
+                conn.close()
+                # Once message content has been sent the server may already
+                # have queued it, so retrying could deliver a duplicate
+                if attempt or data_started:
+                    raise
+                logger.warning(f"SMTP connection lost, reconnecting: {e}")
+                continue
+            except Exception:
+                if data_started:
+                    # The server is still reading message content and would
+                    # take RSET as body text, so the connection cannot be reused
+                    conn.close()
+                else:
+                    try:
+                        conn.rset()
+                        self.release(conn)
+                    except Exception:
+                        conn.close()
+                raise
+            self.release(conn)
+            logger.info(f"Email sent successfully via SMTP ({sent} bytes)")
+            return sent
@@ -1,30 +1,33 @@
 from flask_wtf import FlaskForm
 from flask_wtf.file import FileField, FileAllowed, FileRequired
-from wtforms import StringField, TextAreaField, SubmitField
-from wtforms.validators import DataRequired, Email, Length
+from wtforms import StringField, SubmitField
+from wtforms.validators import DataRequired, Optional, Length, Regexp
+from submission_schema import SUBMISSION_SCHEMA
 
-ALLOWED_EXTENSIONS = {'txt', 'pdf', 'png', 'jpg', 'jpeg', 'gif', 'doc', 'docx'}
+ALLOWED_EXTENSIONS = SUBMISSION_SCHEMA.allowed_extensions
+
+def build_document_upload_form(schema):
+    """Build the WTForms class for the submission form from the schema"""
+    attrs = {}
 
-class DocumentUploadForm(FlaskForm):
     # Driver Information
-    full_name = StringField('Полное имя', validators=[DataRequired(), Length(min=2, max=100)])
-    phone = StringField('Телефон', validators=[DataRequired(), Length(min=10, max=20)])
-    email = StringField('Email', validators=[DataRequired(), Email()])
-    
-    # Required Documents
-    drivers_license = FileField('Водительское удостоверение CDL', 
-                               validators=[FileRequired(), FileAllowed(ALLOWED_EXTENSIONS)])
-    medical_certificate = FileField('Медицинская справка DOT', 
-                                   validators=[FileRequired(), FileAllowed(ALLOWED_EXTENSIONS)])
-    social_security = FileField('Карточка социального страхования', 
-                               validators=[FileRequired(), FileAllowed(ALLOWED_EXTENSIONS)])
-    vehicle_registration = FileField('Регистрация транспортного средства', 
-                                    validators=[FileRequired(), FileAllowed(ALLOWED_EXTENSIONS)])
-    insurance_certificate = FileField('Страховой сертификат', 
-                                     validators=[FileRequired(), FileAllowed(ALLOWED_EXTENSIONS)])
-    ifta_permit = FileField('Разрешение IFTA (если применимо)', 
-                           validators=[FileAllowed(ALLOWED_EXTENSIONS)])
-    mc_authority = FileField('MC Authority (если есть)', 
-                            validators=[FileAllowed(ALLOWED_EXTENSIONS)])
-    
-    submit = SubmitField('Отправить документы')
+    for field in schema.fields:
+        validators = [DataRequired() if field['required'] else Optional()]
+        bounds = {key: field[key + '_length'] for key in ('min', 'max') if key + '_length' in field}
+        if bounds:
+            validators.append(Length(**bounds))
+        if field.get('pattern'):
+            validators.append(Regexp(field['pattern']))
+        attrs[field['name']] = StringField(field['labels']['ru'], validators=validators)
+
+    # Documents
+    for document in schema.documents:
+        validators = [FileAllowed(schema.allowed_extensions)]
+        if document['required']:
+            validators.insert(0, FileRequired())
+        attrs[document['name']] = FileField(document['labels']['ru'], validators=validators)
+
+    attrs['submit'] = SubmitField('Отправить документы')
+    return type('DocumentUploadForm', (FlaskForm,), attrs)
+
+DocumentUploadForm = build_document_upload_form(SUBMISSION_SCHEMA)
@@ -0,0 +1,99 @@
+import os
+import json
+import queue
+import atexit
+import logging
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# Applicant fields allowed in submission records, always masked. Anything
+# else, including free text such as comments, is never logged.
+LOGGED_APPLICANT_FIELDS = ('full_name', 'phone', 'email')
+
+submission_logger = logging.getLogger('submission')
+
+# Global listener, started once per process
+log_listener = None
+
+def get_log_level():
+    """Return the configured log level, DEBUG only in development"""
+    default_level = 'DEBUG' if os.environ.get('FLASK_ENV') == 'development' else 'INFO'
+    return os.environ.get('LOG_LEVEL', default_level).upper()
+
+def setup_logging():
+    """
+    Route all logging through a queue so request threads never block on log I/O
+
+    The root logger only enqueues records; a background QueueListener thread
+    formats them and writes them to stderr. Safe to call more than once.
+    """
+    global log_listener
+    if log_listener:
+        return
+
+    log_queue = queue.SimpleQueue()
+
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    stream_handler.addFilter(lambda record: record.name != submission_logger.name)
+
+    # Submission records are written bare, one parseable JSON object per line
+    submission_handler = logging.StreamHandler()
+    submission_handler.setFormatter(logging.Formatter('%(message)s'))
+    submission_handler.addFilter(lambda record: record.name == submission_logger.name)
+
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(QueueHandler(log_queue))
+    root.setLevel(get_log_level())
+
+    log_listener = QueueListener(log_queue, stream_handler, submission_handler, respect_handler_level=True)
+    log_listener.start()
+    atexit.register(log_listener.stop)
+
+def mask_value(value):
+    """Mask a personal value, keeping only enough to recognise it"""
+    value = str(value or '')
+    if not value:
+        return ''
+    if '@' in value:
+        local, domain = value.split('@', 1)
+        return f"{local[:1]}***@{domain}"
+    if len(value) <= 4:
+        return '***'
+    return f"{value[:1]}***{value[-2:]}"
+
+def mask_form_data(form_data):
+    """Return the allow-listed applicant fields of form data, masked"""
+    return {
+        key: mask_value(form_data[key])
+        for key in LOGGED_APPLICANT_FIELDS
+        if key in form_data
+    }
+
+def log_submission(submission_id, form_data, documents, timings, channels, **extra):
+    """
+    Emit one structured JSON record for a processed submission
+
+    Args:
+        submission_id: Unique ID of the submission
+        form_data: Dictionary containing form data, reduced to masked allow-listed fields
+        documents: Names of the submitted document fields
+        timings: Dictionary of stage name to duration in milliseconds
+        channels: Dictionary of delivery channel name to success flag
+        **extra: Additional fields added to the record as is
+    """
+    record = {
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'event': 'submission',
+        'submission_id': submission_id,
+        'applicant': mask_form_data(form_data),
+        'documents': list(documents),
+        'timings_ms': {stage: round(ms, 1) for stage, ms in timings.items()},
+        'channels': channels,
+    }
+    record.update(extra)
+    submission_logger.info(json.dumps(record, ensure_ascii=False))
@@ -6,13 +6,11 @@ This script should be run separately from the main Flask application.
 
 import os
 import logging
+from logging_config import setup_logging
 from telegram_bot import run_bot_polling
 
 if __name__ == "__main__":
-    logging.basicConfig(
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        level=logging.INFO
-    )
+    setup_logging()
     
     print("Starting Telegram bot...")
     print("Bot will listen for:")
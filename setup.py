@@ -3,7 +3,7 @@ from setuptools import setup
 setup(
     name="trucking-app",
     version="1.0.0",
-    py_modules=["main", "app", "telegram_bot", "email_service", "forms"],
+    py_modules=["main", "app", "telegram_bot", "email_service", "forms", "bundle_service", "logging_config", "tracing", "email_transport", "submission_schema"],
     install_requires=[
         "email-validator==2.2.0",
         "flask==3.1.0",
@@ -1,15 +1,55 @@
 // Mobile Landing Page JavaScript
+//
+// Wrapped so its helpers do not clash with inline page scripts; the
+// schema validator is shared with other pages as window.SubmissionValidation.
+(function() {
+
+// Submission schema shared with the server, embedded in the page or loaded from /api/schema
+let submissionSchema = null;
+
 document.addEventListener('DOMContentLoaded', function() {
     
+    loadSubmissionSchema();
+    
+    // The remaining components belong to the upload form page only
+    if (!document.getElementById('uploadForm')) return;
+    
     // Initialize all components
     initFileUploads();
     initFormValidation();
     initScrollAnimations();
     initCarousel();
+    initConnectionStatus();
+    initSmoothScroll();
     
     console.log('Mobile landing page initialized');
 });
 
+// Return the submission schema, reading it from the page when embedded
+function getSubmissionSchema() {
+    if (!submissionSchema) {
+        const embedded = document.getElementById('submission-schema');
+        if (embedded) {
+            submissionSchema = JSON.parse(embedded.textContent);
+        }
+    }
+    return submissionSchema;
+}
+
+// Load the submission schema used to validate before uploading
+function loadSubmissionSchema() {
+    if (getSubmissionSchema()) return;
+    
+    fetch('/api/schema')
+        .then(response => response.json())
+        .then(schema => {
+            submissionSchema = schema;
+        })
+        .catch(error => {
+            console.warn('Submission schema not available:', error);
+        });
+}
+
 // File Upload Functionality
 function initFileUploads() {
     const fileInputs = document.querySelectorAll('.file-input');
@@ -57,10 +97,10 @@ function initFileUploads() {
 
 // Update file display after selection
 function updateFileDisplay(container, overlay, file) {
-    const maxSize = 16 * 1024 * 1024; // 16MB
+    const schema = getSubmissionSchema();
     
-    if (file.size > maxSize) {
-        showError('Файл слишком большой. Максимальный размер: 16MB');
+    if (schema && file.size > schema.max_file_size) {
+        showError(sizeLimitMessage('file', schema, 'ru'));
         return;
     }
     
@@ -150,23 +190,28 @@ function validateForm() {
         }
     });
     
-    // Validate email format
-    const emailField = document.querySelector('input[type="email"]');
-    if (emailField && emailField.value) {
-        const emailRegex = /^[^\s@]+@[^\s@]+\.[^\s@]+$/;
-        if (!emailRegex.test(emailField.value)) {
-            markFieldInvalid(emailField);
+    const schema = getSubmissionSchema();
+    if (schema) {
+        // Runs after the required pass so its marks are not overwritten
+        const result = validateAgainstSchema(document.getElementById('uploadForm'), schema);
+        result.invalid.forEach(markFieldInvalid);
+        if (result.invalid.length) {
             isValid = false;
         }
-    }
-    
-    // Validate phone format
-    const phoneField = document.querySelector('input[name="phone"]');
-    if (phoneField && phoneField.value) {
-        const phoneRegex = /^[\+]?[1-9][\d]{0,15}$/;
-        if (!phoneRegex.test(phoneField.value.replace(/\s+/g, ''))) {
-            markFieldInvalid(phoneField);
-            isValid = false;
+        if (result.tooLarge) {
+            showError(sizeLimitMessage(result.tooLarge, schema, 'ru'));
+            scrollToFirstError();
+            return false;
+        }
+    } else {
+        // Validate email format
+        const emailField = document.querySelector('input[type="email"]');
+        if (emailField && emailField.value) {
+            const emailRegex = /^[^\s@]+@[^\s@]+\.[^\s@]+$/;
+            if (!emailRegex.test(emailField.value)) {
+                markFieldInvalid(emailField);
+                isValid = false;
+            }
         }
     }
     
@@ -178,6 +223,76 @@ function validateForm() {
     return isValid;
 }
 
+// Validate fields and documents with the rules the server applies.
+// Returns the fields that failed and, when a size limit is exceeded,
+// which one: 'file' or 'request'.
+function validateAgainstSchema(form, schema) {
+    const invalid = [];
+    let tooLarge = null;
+    
+    schema.fields.forEach(rule => {
+        const field = form.querySelector(`[name="${rule.name}"]`);
+        if (!field) return;
+        
+        const value = field.value.trim();
+        if (!value) {
+            if (rule.required) invalid.push(field);
+            return;
+        }
+        
+        const tooShort = rule.min_length && value.length < rule.min_length;
+        const tooLong = rule.max_length && value.length > rule.max_length;
+        const mismatch = rule.pattern && !new RegExp(rule.pattern).test(value);
+        if (tooShort || tooLong || mismatch) {
+            invalid.push(field);
+        }
+    });
+    
+    let totalSize = 0;
+    const selected = [];
+    schema.documents.forEach(rule => {
+        const input = form.querySelector(`input[type="file"][name="${rule.name}"]`);
+        if (!input) return;
+        
+        const file = input.files[0];
+        if (!file) {
+            if (rule.required) invalid.push(input);
+            return;
+        }
+        
+        selected.push(input);
+        totalSize += file.size;
+        const extension = file.name.includes('.') ? file.name.split('.').pop().toLowerCase() : '';
+        if (!schema.allowed_extensions.includes(extension)) {
+            invalid.push(input);
+        } else if (file.size > schema.max_file_size) {
+            invalid.push(input);
+            tooLarge = 'file';
+        }
+    });
+    
+    if (!tooLarge && totalSize > schema.max_request_size) {
+        selected.forEach(input => invalid.push(input));
+        tooLarge = 'request';
+    }
+    
+    return { invalid: invalid, tooLarge: tooLarge };
+}
+
+// Message for an exceeded size limit, in the page language
+function sizeLimitMessage(tooLarge, schema, lang) {
+    if (tooLarge === 'request') {
+        const limit = formatFileSize(schema.max_request_size);
+        return lang === 'en' ?
+            'Files are too large. Maximum total size: ' + limit :
+            'Файлы слишком большие. Максимальный общий размер: ' + limit;
+    }
+    const limit = formatFileSize(schema.max_file_size);
+    return lang === 'en' ?
+        'File is too large. Maximum size: ' + limit :
+        'Файл слишком большой. Максимальный размер: ' + limit;
+}
+
 // Mark field as invalid
 function markFieldInvalid(field) {
     field.classList.add('is-invalid');
@@ -309,7 +424,7 @@ function debounce(func, wait) {
 
 // Input formatting
 document.addEventListener('input', function(e) {
-    if (e.target.name === 'phone') {
+    if (e.target.name === 'phone' && e.target.closest('#uploadForm')) {
         formatPhoneInput(e.target);
     }
 });
@@ -329,13 +444,15 @@ function formatPhoneInput(input) {
 }
 
 // Handle network errors
-window.addEventListener('online', function() {
-    showSuccessMessage('Соединение восстановлено');
-});
-
-window.addEventListener('offline', function() {
-    showError('Нет соединения с интернетом. Проверьте подключение.');
-});
+function initConnectionStatus() {
+    window.addEventListener('online', function() {
+        showSuccessMessage('Соединение восстановлено');
+    });
+    
+    window.addEventListener('offline', function() {
+        showError('Нет соединения с интернетом. Проверьте подключение.');
+    });
+}
 
 function showSuccessMessage(message) {
     const successDiv = document.createElement('div');
@@ -355,15 +472,24 @@ function showSuccessMessage(message) {
 }
 
 // Smooth scrolling for anchor links
-document.querySelectorAll('a[href^="#"]').forEach(anchor => {
-    anchor.addEventListener('click', function (e) {
-        e.preventDefault();
-        const target = document.querySelector(this.getAttribute('href'));
-        if (target) {
-            target.scrollIntoView({
-                behavior: 'smooth',
-                block: 'start'
-            });
-        }
+function initSmoothScroll() {
+    document.querySelectorAll('a[href^="#"]').forEach(anchor => {
+        anchor.addEventListener('click', function (e) {
+            e.preventDefault();
+            const target = document.querySelector(this.getAttribute('href'));
+            if (target) {
+                target.scrollIntoView({
+                    behavior: 'smooth',
+                    block: 'start'
+                });
+            }
+        });
     });
-});
+}
+
+window.SubmissionValidation = {
+    getSchema: getSubmissionSchema,
+    validate: validateAgainstSchema,
+    sizeLimitMessage: sizeLimitMessage
+};
+})();
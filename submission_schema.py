@@ -0,0 +1,175 @@
+import os
+import re
+import json
+
+# Single definition of the submission form, shared by the endpoints,
+# the delivery channels and the browser (served at /api/schema).
+# Patterns must be valid both as Python and JavaScript regular expressions.
+SCHEMA_DEFINITION = {
+    'max_file_size': 16 * 1024 * 1024,
+    'max_request_size': 16 * 1024 * 1024,
+    'allowed_extensions': ['txt', 'pdf', 'png', 'jpg', 'jpeg', 'gif', 'doc', 'docx'],
+    'fields': [
+        {
+            'name': 'full_name',
+            'required': True,
+            'min_length': 2,
+            'max_length': 100,
+            'labels': {'ru': 'Полное имя', 'en': 'Full Name'}
+        },
+        {
+            'name': 'phone',
+            'required': True,
+            'min_length': 10,
+            'max_length': 20,
+            'pattern': r'^\+?[\d\s().-]+$',
+            'labels': {'ru': 'Телефон', 'en': 'Phone'}
+        },
+        {
+            'name': 'email',
+            'required': True,
+            'max_length': 254,
+            'pattern': r'^[^\s@]+@[^\s@]+\.[^\s@]+$',
+            'labels': {'ru': 'Email', 'en': 'Email'}
+        },
+        {
+            'name': 'experience',
+            'required': False,
+            'labels': {'ru': 'Опыт', 'en': 'Experience'}
+        },
+        {
+            'name': 'comments',
+            'required': False,
+            'labels': {'ru': 'Комментарии', 'en': 'Comments'}
+        }
+    ],
+    'documents': [
+        {
+            'name': 'drivers_license',
+            'required': True,
+            'labels': {'ru': 'Водительское удостоверение CDL', 'en': 'CDL Driver License'}
+        },
+        {
+            'name': 'medical_certificate',
+            'required': True,
+            'labels': {'ru': 'Медицинская справка DOT', 'en': 'DOT Medical Certificate'}
+        },
+        {
+            'name': 'vehicle_registration',
+            'required': True,
+            'labels': {'ru': 'Регистрация транспортного средства', 'en': 'Vehicle Registration'}
+        },
+        {
+            'name': 'insurance_certificate',
+            'required': True,
+            'labels': {'ru': 'Страховой сертификат', 'en': 'Insurance Certificate'}
+        },
+        {
+            'name': 'w9_form',
+            'required': True,
+            'labels': {'ru': 'Форма W-9', 'en': 'W-9 Form'}
+        },
+        {
+            'name': 'mc_authority',
+            'required': False,
+            'labels': {'ru': 'MC Authority', 'en': 'MC Authority'}
+        }
+    ]
+}
+
+def file_size(file_obj):
+    """Return the size in bytes of an uploaded file without reading it"""
+    position = file_obj.tell()
+    file_obj.seek(0, os.SEEK_END)
+    size = file_obj.tell()
+    file_obj.seek(position)
+    return size
+
+def format_file_size(size):
+    """Format a size in bytes the way the browser does, e.g. '16 MB'"""
+    for unit in ('Bytes', 'KB', 'MB'):
+        if size < 1024:
+            return f"{round(size, 2):g} {unit}"
+        size /= 1024
+    return f"{round(size, 2):g} GB"
+
+class SubmissionSchema:
+    """The schema definition compiled once into lookup tables and validators"""
+
+    def __init__(self, definition):
+        self.definition = definition
+        self.max_file_size = definition['max_file_size']
+        self.max_request_size = definition['max_request_size']
+        self.allowed_extensions = frozenset(definition['allowed_extensions'])
+
+        self.fields = definition['fields']
+        self.field_names = tuple(field['name'] for field in self.fields)
+        self.required_fields = tuple(field['name'] for field in self.fields if field['required'])
+        self.field_checks = tuple(
+            (
+                field['name'],
+                field.get('min_length', 0),
+                field.get('max_length'),
+                re.compile(field['pattern']) if field.get('pattern') else None
+            )
+            for field in self.fields
+        )
+
+        self.documents = definition['documents']
+        self.document_names = tuple(document['name'] for document in self.documents)
+        self.required_documents = tuple(document['name'] for document in self.documents if document['required'])
+        self.document_labels = {
+            lang: {document['name']: document['labels'][lang] for document in self.documents}
+            for lang in ('ru', 'en')
+        }
+
+        # Serialised once, served as is to the browser; '<' is escaped so
+        # the same string can be embedded in a <script> block
+        self.json = json.dumps(definition, ensure_ascii=False).replace('<', '\\u003c')
+
+    def allowed_file(self, filename):
+        return '.' in filename and \
+               filename.rsplit('.', 1)[1].lower() in self.allowed_extensions
+
+    def validate(self, form, files):
+        """
+        Validate a submission in a single pass over the schema
+
+        Args:
+            form: Mapping of submitted form values
+            files: Mapping of submitted files
+
+        Returns:
+            tuple: (form_data, documents, error) where error is None when the
+            submission is valid, otherwise a message for the client
+        """
+        form_data = {name: form.get(name, '').strip() for name in self.field_names}
+
+        if not all(form_data[name] for name in self.required_fields):
+            return form_data, {}, 'All personal information fields are required'
+
+        for name, min_length, max_length, pattern in self.field_checks:
+            value = form_data[name]
+            if not value:
+                continue
+            if len(value) < min_length or (max_length and len(value) > max_length) \
+                    or (pattern and not pattern.match(value)):
+                return form_data, {}, f'Invalid value for {name}'
+
+        documents = {}
+        for name in self.document_names:
+            file_obj = files.get(name)
+            if file_obj and file_obj.filename:
+                if not self.allowed_file(file_obj.filename):
+                    return form_data, {}, f'Invalid file type for {name}'
+                if file_size(file_obj) > self.max_file_size:
+                    return form_data, {}, f'File too large for {name}, maximum size is {format_file_size(self.max_file_size)}'
+                documents[name] = file_obj
+
+        missing_docs = [name for name in self.required_documents if name not in documents]
+        if missing_docs:
+            return form_data, documents, f'Missing required documents: {", ".join(missing_docs)}'
+
+        return form_data, documents, None
+
+SUBMISSION_SCHEMA = SubmissionSchema(SCHEMA_DEFINITION)
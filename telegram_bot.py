@@ -3,12 +3,13 @@ import asyncio
 import logging
 import json
 from datetime import datetime
+from bundle_service import format_manifest
+from submission_schema import SUBMISSION_SCHEMA
+from logging_config import setup_logging
+from tracing import span
 
 # Configure logging
-logging.basicConfig(
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    level=logging.INFO
-)
+setup_logging()
 logger = logging.getLogger(__name__)
 
 # Try to import telegram modules with fallback
@@ -40,7 +41,7 @@ def initialize_bot():
         logger.error(f"Failed to initialize Telegram bot: {e}")
         return False
 
-async def send_application_to_telegram(form_data, files):
+async def send_application_to_telegram(form_data, files, bundle=None):
     """Send application data to Telegram bot subscribers"""
     global trucking_bot
     if not TELEGRAM_AVAILABLE:
@@ -49,7 +50,7 @@ async def send_application_to_telegram(form_data, files):
         
     if trucking_bot:
         try:
-            await trucking_bot.send_application_to_subscribers(form_data, files)
+            await trucking_bot.send_application_to_subscribers(form_data, files, bundle)
             return True
         except Exception as e:
             logger.error(f"Error sending application to Telegram: {e}")
@@ -143,12 +144,15 @@ if TELEGRAM_AVAILABLE:
             else:
                 await update.message.reply_text("❌ Вы не подписаны на уведомления. Используйте /start для подписки.")
         
-        async def send_application_to_subscribers(self, form_data, files):
+        async def send_application_to_subscribers(self, form_data, files, bundle=None):
             """Send new application to all subscribers"""
             if not self.subscribers:
                 logger.info("No subscribers to notify")
                 return
             
+            # In bundle mode the documents arrive as one ZIP, so count its entries
+            document_count = len(bundle['manifest']) if bundle else len(files)
+            
             # Format the message
             message = f"""
 🚛 **Новая заявка от водителя**
@@ -159,51 +163,87 @@ if TELEGRAM_AVAILABLE:
 • Email: {form_data.get('email', 'Не указан')}
 
 📄 **Документы прикреплены:**
-{len(files)} файл(ов)
+{document_count} файл(ов)
 
 ⏰ Время подачи: {datetime.now().strftime('%d.%m.%Y %H:%M')}
 """
             
             # Document names mapping
-            document_names = {
-                'drivers_license': 'Водительское удостоверение CDL',
-                'medical_certificate': 'Медицинская справка DOT',
-                'social_security': 'Карточка социального страхования',
-                'vehicle_registration': 'Регистрация транспортного средства',
-                'insurance_certificate': 'Страховой сертификат',
-                'ifta_permit': 'Разрешение IFTA',
-                'mc_authority': 'MC Authority'
-            }
+            document_names = SUBMISSION_SCHEMA.document_labels['ru']
+            
+            bundle_caption = None
+            bundle_file_id = None
+            if bundle:
+                bundle_caption = "📦 Документы заявки:\n" + "\n".join(
+                    f"• {line}" for line in format_manifest(bundle['manifest'], document_names)
+                )
             
             # Send to all subscribers
             for chat_id in self.subscribers.copy():
-                try:
-                    # Send the main message
-                    await self.bot.send_message(
-                        chat_id=chat_id,
-                        text=message,
-                        parse_mode=ParseMode.MARKDOWN
-                    )
-                    
-                    # Send each file
-                    for file_key, file_obj in files.items():
-                        if file_key in document_names:
-                            try:
-                                file_obj.seek(0)  # Reset file pointer
-                                await self.bot.send_document(
-                                    chat_id=chat_id,
-                                    document=file_obj,
-                                    caption=f"📄 {document_names[file_key]}"
-                                )
-                            except Exception as e:
-                                logger.error(f"Error sending file {file_key} to {chat_id}: {e}")
-                    
-                except Exception as e:
-                    logger.error(f"Error sending message to subscriber {chat_id}: {e}")
-                    # Remove invalid chat IDs
-                    if "blocked" in str(e).lower():
-                        self.subscribers.discard(chat_id)
-                        self.save_subscribers()
+                with span('telegram.subscriber', chat_id=chat_id) as subscriber_span:
+                    try:
+                        # Send the main message
+                        await self.bot.send_message(
+                            chat_id=chat_id,
+                            text=message,
+                            parse_mode=ParseMode.MARKDOWN
+                        )
+                        
+                        if bundle:
+                            # Upload the bundle once, then reuse its file_id for other subscribers
+                            with span('telegram.document', document=bundle['filename']) as document_span:
+                                try:
+                                    if bundle_file_id:
+                                        await self.bot.send_document(
+                                            chat_id=chat_id,
+                                            document=bundle_file_id,
+                                            caption=bundle_caption
+                                        )
+                                        bytes_sent = 0
+                                    else:
+                                        with open(bundle['path'], 'rb') as bundle_file:
+                                            sent = await self.bot.send_document(
+                                                chat_id=chat_id,
+                                                document=bundle_file,
+                                                filename=bundle['filename'],
+                                                caption=bundle_caption
+                                            )
+                                        bundle_file_id = sent.document.file_id
+                                        bytes_sent = os.path.getsize(bundle['path'])
+                                    if document_span:
+                                        document_span.set_attribute('bytes', bytes_sent)
+                                except Exception as e:
+                                    logger.error(f"Error sending document bundle to {chat_id}: {e}")
+                                    if document_span:
+                                        document_span.set_error(e)
+                            continue
+                        
+                        # Send each file
+                        for file_key, file_obj in files.items():
+                            if file_key in document_names:
+                                with span('telegram.document', document=file_key) as document_span:
+                                    try:
+                                        file_obj.seek(0)  # Reset file pointer
+                                        await self.bot.send_document(
+                                            chat_id=chat_id,
+                                            document=file_obj,
+                                            caption=f"📄 {document_names[file_key]}"
+                                        )
+                                        if document_span:
+                                            document_span.set_attribute('bytes', file_obj.getbuffer().nbytes)
+                                    except Exception as e:
+                                        logger.error(f"Error sending file {file_key} to {chat_id}: {e}")
+                                        if document_span:
+                                            document_span.set_error(e)
+                        
+                    except Exception as e:
+                        logger.error(f"Error sending message to subscriber {chat_id}: {e}")
+                        if subscriber_span:
+                            subscriber_span.set_error(e)
+                        # Remove invalid chat IDs
+                        if "blocked" in str(e).lower():
+                            self.subscribers.discard(chat_id)
+                            self.save_subscribers()
         
         def setup_application(self):
             """Setup the telegram application with handlers"""
@@ -0,0 +1,223 @@
+import os
+import json
+import time
+import queue
+import atexit
+import logging
+import functools
+from uuid import uuid4
+from contextlib import contextmanager
+from contextvars import ContextVar
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+logger = logging.getLogger(__name__)
+
+# Export traces as OTLP/JSON lines to a local file, or 'none' to disable
+TRACE_EXPORT = os.environ.get('TRACE_EXPORT', 'jsonl').lower()
+TRACE_EXPORT_PATH = os.environ.get('TRACE_EXPORT_PATH', os.path.join('traces', 'traces.jsonl'))
+TRACE_EXPORT_MAX_BYTES = int(os.environ.get('TRACE_EXPORT_MAX_BYTES', 10 * 1024 * 1024))
+TRACE_EXPORT_BACKUPS = int(os.environ.get('TRACE_EXPORT_BACKUPS', 3))
+SERVICE_NAME = 'truckowner'
+
+current_trace = ContextVar('current_trace', default=None)
+current_span = ContextVar('current_span', default=None)
+
+export_logger = logging.getLogger('trace.export')
+
+# Global listener, started once per process
+export_listener = None
+
+class Span:
+    """A timed unit of work inside a trace"""
+
+    def __init__(self, trace, name, parent=None, attributes=None):
+        self.trace = trace
+        self.name = name
+        self.span_id = uuid4().hex[:16]
+        self.parent_id = parent.span_id if parent else None
+        self.attributes = dict(attributes or {})
+        self.status = 'ok'
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self._started = time.perf_counter()
+        self.duration_ms = None
+        trace.spans.append(self)
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+    def set_error(self, error):
+        self.status = 'error'
+        self.attributes['error'] = str(error)
+
+    def end(self, status=None):
+        if self.end_ns is not None:
+            return
+        if status:
+            self.status = status
+        self.duration_ms = (time.perf_counter() - self._started) * 1000
+        self.end_ns = time.time_ns()
+
+    def to_otlp(self):
+        """Return the span in OTLP/JSON form"""
+        return {
+            'traceId': self.trace.trace_id,
+            'spanId': self.span_id,
+            'parentSpanId': self.parent_id or '',
+            'name': self.name,
+            'startTimeUnixNano': str(self.start_ns),
+            'endTimeUnixNano': str(self.end_ns),
+            'attributes': [
+                {'key': key, 'value': otlp_value(value)}
+                for key, value in self.attributes.items()
+            ],
+            'status': {'code': 'STATUS_CODE_ERROR' if self.status == 'error' else 'STATUS_CODE_OK'}
+        }
+
+class Trace:
+    """All spans recorded for one request, rooted at a single span"""
+
+    def __init__(self, name, attributes=None):
+        self.trace_id = uuid4().hex
+        self.spans = []
+        self.root = Span(self, name, attributes=attributes)
+
+    def stage_timings(self):
+        """Durations in milliseconds of the root's direct children, plus the total so far"""
+        timings = {
+            child.name: child.duration_ms
+            for child in self.spans
+            if child.parent_id == self.root.span_id and child.duration_ms is not None
+        }
+        timings['total'] = (time.perf_counter() - self.root._started) * 1000
+        return timings
+
+    def to_otlp(self):
+        """Return the trace as an OTLP/JSON ResourceSpans export request"""
+        return {
+            'resourceSpans': [{
+                'resource': {
+                    'attributes': [{'key': 'service.name', 'value': otlp_value(SERVICE_NAME)}]
+                },
+                'scopeSpans': [{
+                    'scope': {'name': __name__},
+                    'spans': [span.to_otlp() for span in self.spans]
+                }]
+            }]
+        }
+
+def otlp_value(value):
+    """Wrap a Python value as an OTLP AnyValue"""
+    if isinstance(value, bool):
+        return {'boolValue': value}
+    if isinstance(value, int):
+        return {'intValue': str(value)}
+    if isinstance(value, float):
+        return {'doubleValue': value}
+    return {'stringValue': str(value)}
+
+def setup_trace_export():
+    """
+    Start the background exporter that appends finished traces to TRACE_EXPORT_PATH
+
+    Traces are queued and written by a QueueListener thread, so request
+    threads never block on export I/O. The file is rotated at
+    TRACE_EXPORT_MAX_BYTES, keeping TRACE_EXPORT_BACKUPS old files.
+    Safe to call more than once.
+    """
+    global export_listener
+    if export_listener or TRACE_EXPORT == 'none':
+        return
+
+    export_dir = os.path.dirname(TRACE_EXPORT_PATH)
+    if export_dir:
+        os.makedirs(export_dir, exist_ok=True)
+
+    export_queue = queue.SimpleQueue()
+    file_handler = RotatingFileHandler(
+        TRACE_EXPORT_PATH,
+        maxBytes=TRACE_EXPORT_MAX_BYTES,
+        backupCount=TRACE_EXPORT_BACKUPS,
+        encoding='utf-8'
+    )
+    file_handler.setFormatter(logging.Formatter('%(message)s'))
+
+    export_logger.addHandler(QueueHandler(export_queue))
+    export_logger.setLevel(logging.INFO)
+    export_logger.propagate = False
+
+    export_listener = QueueListener(export_queue, file_handler)
+    export_listener.start()
+    atexit.register(export_listener.stop)
+
+def export_trace(trace):
+    """End any open spans and hand the trace to the exporter"""
+    for open_span in reversed(trace.spans):
+        open_span.end()
+    if export_listener:
+        export_logger.info(json.dumps(trace.to_otlp(), ensure_ascii=False))
+
+def get_trace():
+    """Return the trace of the current request, or None outside a trace"""
+    return current_trace.get()
+
+def get_trace_id():
+    trace = current_trace.get()
+    return trace.trace_id if trace else None
+
+def traced(name):
+    """Decorator that records a view call as a trace and exports it on return"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            trace = Trace(name)
+            trace_token = current_trace.set(trace)
+            span_token = current_span.set(trace.root)
+            try:
+                return func(*args, **kwargs)
+            except Exception:
+                trace.root.status = 'error'
+                raise
+            finally:
+                current_span.reset(span_token)
+                current_trace.reset(trace_token)
+                try:
+                    export_trace(trace)
+                except Exception as e:
+                    logger.error(f"Error exporting trace {trace.trace_id}: {e}")
+        return wrapper
+    return decorator
+
+def start_span(name, **attributes):
+    """
+    Start a child span of the current span without making it current
+
+    Returns None outside a trace. The caller ends it with span.end().
+    """
+    trace = current_trace.get()
+    if not trace:
+        return None
+    return Span(trace, name, parent=current_span.get(), attributes=attributes)
+
+@contextmanager
+def span(name, **attributes):
+    """
+    Record the enclosed block as a child span of the current span
+
+    Yields the span, or None outside a trace so callers can guard
+    attribute updates with a simple truthiness check.
+    """
+    new_span = start_span(name, **attributes)
+    if not new_span:
+        yield None
+        return
+
+    token = current_span.set(new_span)
+    try:
+        yield new_span
+    except Exception:
+        new_span.end('error')
+        raise
+    finally:
+        current_span.reset(token)
+        new_span.end()